@@ -0,0 +1,94 @@
+"""Allocation benchmark for the per-match date handlers.
+
+For each kind of date, extracts dates from a text repeating one phrase and
+reports, per match:
+
+    kept     memory blocks still allocated afterwards, i.e. the result
+             (date, range) tuple, its range with its start and stop ints,
+             and its date string when that is not an interned table entry;
+    churn    peak memory, in bytes, held during the extraction besides the
+             results and beyond the peak of the bare regex scan of the same
+             text. It stays near 0 as long as every intermediate object,
+             including candidates that lose to an overlapping one, is
+             freed before the next match is handled; it does not count
+             short-lived allocations.
+
+Usage:
+    python benchmark.py [matches]
+"""
+import gc
+import sys
+import datetime
+import tracemalloc
+from dates import DateService
+
+__phrases__ = [
+    ('month day year', 'on august 17th, 1926; '),
+    ('month day', 'on august 17th; '),
+    ('day month year', 'the 17 august 1926; '),
+    ('month year', 'in august 1926; '),
+    ('numeric', 'on 3/4/2001; '),
+    ('year', 'in 1926; '),
+    ('weekday', 'next friday; '),
+    ('offset', 'two days from now; '),
+]
+
+
+def scan(service, text, irregular):
+    """Runs the regexes of an extraction without handling the matches."""
+    regexes = [service._dayRegex2, service._dayRegex3, service._dayRegex4,
+               service._dayRegex5]
+    if irregular:
+        regexes = [service._dayRegex]
+    return [[None for m in regex.finditer(text)] for regex in regexes]
+
+
+def kept(extract, text):
+    """Returns the result of extract(text) and the number of memory blocks
+    it leaves allocated."""
+    gc.collect()
+    before = sys.getallocatedblocks()
+    result = extract(text)
+    return result, sys.getallocatedblocks() - before
+
+
+def churn(extract, text):
+    """Returns the bytes extract(text) allocates above what it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = extract(text)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - current
+
+
+def main(matches=10000):
+    service = DateService(now=datetime.datetime(2016, 1, 1))
+    gc.disable()
+    print('%-16s %8s %8s %10s' % ('phrase', 'hits', 'kept', 'churn'))
+    for name, phrase in __phrases__:
+        text = phrase * matches
+        irregular = name in ('weekday', 'offset')
+        if irregular:
+            extract = service.extractIrrDays
+        else:
+            extract = service.extractDays
+
+        def bare(text):
+            return scan(service, text, irregular)
+
+        extract(text)
+        days, blocks = kept(extract, text)
+        hits = len(days)
+        _, listBlocks = kept(lambda text: [None] * hits, text)
+        extra = churn(extract, text) - churn(bare, text)
+        print('%-16s %8d %8.2f %10.1f' % (
+            name, hits, float(blocks - listBlocks) / hits,
+            float(extra) / hits))
+        del days
+    gc.enable()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
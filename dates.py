@@ -1,5 +1,16 @@
+import os
 import re
+import math
+import mmap
+import struct
+import sys
+import bisect
+import calendar
 import datetime
+import collections
+from array import array
+import multiprocessing
+from multiprocessing import shared_memory
 from numbers import NumberService
 
 
@@ -16,33 +27,59 @@ class DateService(object):
             datetime returned will be now + datetime.timedelta(hours=5).
             Uses datetime.datetime.now() if none is supplied.
 
+        locales: Locale codes (see Lexicon) whose month, weekday and
+            relative words should be recognized. English only if none are
+            supplied.
+
     Returns:
         A DateService which uses tz and now for all of its computations.
+
+    Attributes:
+        failures: A collections.Counter of the candidate matches rejected
+            during extraction, keyed by the kind of failure (e.g.,
+            'dayNotNumber', 'invalidDate', 'yearOutOfRange').
     """
 
-    def __init__(self, tz=None, now=None):
+    def __init__(self, tz=None, now=None, locales=('en',)):
         self.tz = tz
         if now:
             self.now = now
         else:
             self.now = datetime.datetime.now(tz=self.tz)
-
-    __startMonths__ = ['jan', 'feb', 'mar', 'apr', 'may',
-                       'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-
-    __daysOfWeek__ = ['monday', 'tuesday', 'wednesday',
-                      'thursday', 'friday', 'saturday', 'sunday']
+        self.failures = collections.Counter()
+        self._cacheDay = None
+        self._dayCache = {}
+        self._timeCache = {}
+
+        locales = tuple(locales)
+        if locales not in DateService.__compiled__:
+            lexicon = Lexicon(locales)
+            patterns = dict(lexicon.patterns, number=self._numberPattern)
+            patterns['starts'] = _trieRegex(
+                set(lexicon.units) | set(lexicon.deictic) |
+                set(lexicon.relative) | set(lexicon.weekdays) |
+                set(self.__startWords__))
+            DateService.__compiled__[locales] = (lexicon,) + tuple(
+                re.compile(pattern % patterns) for pattern in
+                (self._dayPattern, self._dayPattern2, self._dayPattern3))
+        self.lexicon, self._dayRegex, self._dayRegex2, self._dayRegex3 = \
+            DateService.__compiled__[locales]
+
+    # Lexicon and day regexes compiled for each tuple of locales
+    __compiled__ = {}
+
+    # Words _dayPattern can start with besides those of the lexicon
+    __startWords__ = ['in', 'morning', 'afternoon', 'evening']
 
     __relativeDates__ = ['tomorrow', 'tonight', 'next']
 
-    __todayMatches__ = ['tonight', 'today', 'this morning', 'now'
-                        'this evening', 'this afternoon']
+    __timesOfDay__ = {'morning': (8, 0), 'afternoon': (12, 0),
+                      'evening': (19, 0)}
 
-    __tomorrowMatches__ = ['yesterday', 'last morning', 'last night'
-                           'last evening', 'last afternoon']
+    # Largest gap, in characters, between a time and the date it belongs to
+    __timeWindow__ = 16
 
-    __yesterdayMatches__ = ['tomorrow', 'next morning', 'next night'
-                           'next evening', 'next afternoon']
+    __partsOfDay__ = ['morning', 'afternoon', 'evening', 'night']
 
     __dateDescriptors__ = {
         'a': 1, '1st': 1, 'one': 1, 'first': 1,
@@ -78,189 +115,244 @@ class DateService(object):
         '31st': 31, 'thirty one': 31, 'thirty first': 31
     }
 
+    # Digit tokens of every day, zero-padded up to the five characters a
+    # day token can have
+    __dayNumbers__ = dict(('%0*d' % (width, day), day)
+                          for day in range(1, 32) for width in range(1, 6))
+
+    # Year tokens within the supported range
+    __years__ = dict(('%d' % year, year) for year in range(1800, 2021))
+
+    # Interned 'MM/DD/' prefixes of the output dates, indexed by
+    # [month][day], where 0 stands for 'XX'
+    __prefixes__ = [[sys.intern('%s/%s/' % ('%02d' % month if month else 'XX',
+                                            '%02d' % day if day else 'XX'))
+                     for day in range(32)] for month in range(13)]
+
+    # The same, without the trailing '/', for dates in the current year
+    __anchors__ = [[sys.intern(prefix[:-1]) for prefix in prefixes]
+                   for prefixes in __prefixes__]
+
+    # Days in each month of a common year
+    __monthLengths__ = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
 # will extract semantic dates
 # (number)?(week|day(s)?\ from\ )?
 # |tomorrow|today|tonight
 # |next|this|last (morning|afternoon|evening|Monday|...|Sunday|Month)
 # |(Monday|...|Sunday)
-    _dayRegex = re.compile(
-        r"""(?ix)
-        ((week|day|month|year)s?\ (ago|before|from)\ ?)?
-        (
-            tomorrow
-            |now
-            |tonight
-            |today
-            |yesterday
-            |(next|this|last)[\ \b](morning|afternoon|evening|night
-                    |week|Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday
-                    |Month|(Jan\.?(?:uary)?|Feb\.?(?:ruary)?|Mar\.?(?:ch)?|Apr\.?(?:il)?|May\.?|Jun\.?e?|Jul\.?y?|Aug\.?(?:ust)?|Sept?\.?(?:tember)?|Oct\.?(?:ober)?|Nov\.?(?:ember)?|Dec\.?(?:ember)?))
-                    |year
-            |(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)
-        )?
-        """)
+# The %(...)s word lists are filled in from the Lexicon of each locale set.
+# Matches start at a word boundary and are never empty, so the word lists
+# are only tried where a word starts.
+    _dayPattern = r"""(?ix)\b(?=%(starts)s|\d)
+        ((%(units)s)\ (%(directions)s)\ ?)?
+        (?:(
+            %(deictic)s
+            |(%(relative)s)[\ \b](%(periods)s|%(weekdays)s|(%(months)s))
+            |(%(weekdays)s)
+            |\b(\d{1,2}:\d{2})\b(?:\ ?(am|pm)\b)?
+            |in\ (%(number)s(?:\ %(number)s){0,5})\ (hours?|minutes?)
+                (?:\ (?:and\ )?(%(number)s(?:\ %(number)s){0,5})
+                    \ (hours?|minutes?))?
+            |\b(morning|afternoon|evening)\b
+        )|(?(1)|(?!)))
+        """
+
+    # Words a number of hours or minutes can be made of
+    _numberPattern = r'(?:[\d.,]+|%s)\b' % '|'.join(sorted(
+        list(NumberService.__small__) + list(NumberService.__magnitude__) +
+        list(NumberService.__fractions__) + ['hundred', 'and', 'a', 'point'],
+        key=len, reverse=True))
 
     # mon day year
-    _dayRegex2 = re.compile(
-            r'(?ix)(\bJan\.?(?:uary)?\b|\bFeb\.?(?:ruary)?\b|\bMar\.?(?:ch)?\b|\bApr\.?(?:il)?\b|\bMay\.?\b|\bJun\.?e?\b|\bJul\.?y?\b|\bAug\.?(?:ust)?\b|\bSept?\.?(?:tember)?\b|\bOct\.?(?:ober)?\b|\bNov\.?(?:ember)?\b|\bDec\.?(?:ember)?\b)[., ]+(\w{,5})(.{,4}(\b\d{4}\b))?'
-    )
+    _dayPattern2 = r'(?ix)(\b(?:%(months)s)\b)[., ]+(\w{,5})(.{,4}(\b\d{4}\b))?'
 
     # day mon year
-    _dayRegex3 = re.compile(
-            r'(?ix)(\w{,5})[., ]+(\bJan\.?(?:uary)?\b|\bFeb\.?(?:ruary)?\b|\bMar\.?(?:ch)?\b|\bApr\.?(?:il)?\b|\bMay\.?\b|\bJun\.?e?\b|\bJul\.?y?\b|\bAug\.?(?:ust)?\b|\bSept?\.?(?:tember)?\b|\bOct\.?(?:ober)?\b|\bNov\.?(?:ember)?\b|\bDec\.?(?:ember)?\b)(.{,4}(\b\d{4}\b))?'
-    )
+    _dayPattern3 = r'(?ix)(\w{,5})[., ]+(\b(?:%(months)s)\b)(.{,4}(\b\d{4}\b))?'
 
     # month/day/year
-    _dayRegex4 = re.compile(r'(\D|\b)(\d{1,2}/\d{1,2}/\d{4})(\D|\b)')
+    _dayRegex4 = re.compile(r'(?<!\d)((\d{1,2})/(\d{1,2})/(\d{4}))(?!\d)')
 
     #only year
-    _dayRegex5 = re.compile('\D(\d{4})\D')
+    _dayRegex5 = re.compile(r'(?<=\D)(\d{4})(?=\D)')
 
 
-    _timeRegex = re.compile(
-        r"""(?ix)
-        .*?
-        (
-            morning
-            |afternoon
-            |evening
-            |(\d{1,2}\:\d{2})\ ?(am|pm)?
-            |in\ (.+?)\ (hours|minutes)(\ (?:and\ )?(.+?)\ (hours|minutes))?
-        )
-        .*?""")
-
     def _preprocess(self, input):
         return input.replace('-', ' ').lower()
 
     def combineDays(self, DaysA, DaysB):
-        DaysA = [day for day in DaysA if day]
-        DaysB = [day for day in DaysB if day]
-        if not DaysA:
-            return DaysB
-        if not DaysB:
-            return DaysA
-
-        def combine(A, B):
-            if (not A) and (not B):
-                return []
-            if not A:
-                return B
-            if not B:
-                return A
-            itemA = A[0]
-            itemB = B[0]
+        return list(self._combineLazily(DaysA, DaysB))
+
+    def _combineLazily(self, DaysA, DaysB):
+        """Generator behind combineDays, consuming both inputs only as far
+        as needed, so that a chain of them merges the candidates of several
+        formats without building a list per format."""
+        DaysA = (day for day in DaysA if day)
+        DaysB = (day for day in DaysB if day)
+
+        # Merge the two ordered lists; of two overlapping days, keep the
+        # one with fewer 'XX' parts
+        itemA = next(DaysA, None)
+        itemB = next(DaysB, None)
+        while itemA is not None and itemB is not None:
             if (itemA[1].stop <= itemB[1].start):
-                return [itemA] + combine(A[1:], B)
-            if (itemB[1].stop <= itemA[1].start):
-                return [itemB] + combine(A, B[1:])
-            if (itemA[0].count('X') >= itemB[0].count('X')):
-                return [itemB] + combine(A[1:], B[1:])
+                yield itemA
+                itemA = next(DaysA, None)
+            elif (itemB[1].stop <= itemA[1].start):
+                yield itemB
+                itemB = next(DaysB, None)
             else:
-                return [itemA] + combine(A[1:], B[1:])
-        return combine(DaysA, DaysB)
+                if (itemA[0].count('X') >= itemB[0].count('X')):
+                    yield itemB
+                else:
+                    yield itemA
+                itemA = next(DaysA, None)
+                itemB = next(DaysB, None)
+        if itemA is not None:
+            yield itemA
+            yield from DaysA
+        if itemB is not None:
+            yield itemB
+            yield from DaysB
 
     def extractDays(self, input):
-        def safe(exp):
-            """For safe evaluation of regex groups"""
-            try:
-                return exp()
-            except:
-                return None
+        Days = ()
+        for days in self._dayCandidates(input):
+            Days = self._combineLazily(Days, days)
+        return list(Days)
+
+    def _dayCandidates(self, input):
+        """Returns an iterator over the unmerged candidates of each regular
+        format, in the order extractDays combines them."""
+        resolveHit = self._resolveHit
+        return [(resolveHit(hit) for hit in hits)
+                for hits in self._symbolicDays(input)]
+
+    def _symbolicDays(self, input, window=None):
+        """Returns an iterator over the unmerged symbolic hits of each
+        regular format, in the order extractDays combines them. Only the
+        matches starting inside window, a (start, end) tuple, are handled
+        if one is supplied."""
+        failures = self.failures
+        months = self.lexicon.months
+        days = self.lexicon.days
+        years = self.__years__
+        prefixes = self.__prefixes__
+        anchors = self.__anchors__
 
         def extractMonth(dayMatch):
-            if dayMatch[:3] in self.__startMonths__:
-                return self.__startMonths__.index(dayMatch[:3]) + 1
+            return months.get(dayMatch)
 
         def extractDay(dayMatch):
-            if dayMatch in self.__dateDescriptors__:
-                return self.__dateDescriptors__[dayMatch]
-            elif dayMatch.isalnum() and \
-                (int(dayMatch) in self.__dateDescriptors__.values()):
+            day = days.get(dayMatch)
+            if day is not None:
+                return day
+            if not dayMatch.isdecimal():
+                if dayMatch:
+                    failures['dayNotNumber'] += 1
+                return None
+            # Digits outside ASCII
+            if 1 <= int(dayMatch) <= 31:
                 return int(dayMatch)
+            failures['dayOutOfRange'] += 1
 
         def extractYear(dayMatch):
+            year = years.get(dayMatch)
+            if year is not None:
+                return year
             if (not dayMatch):
                 return None
-            if (not dayMatch.isalnum()):
+            if (not dayMatch.isdecimal()):
                 return None
             year = int(dayMatch)
             if (1800 <= year <= 2020):
                 return year
+            failures['yearOutOfRange'] += 1
 
         def handleMatch(dateMatch):
-            month = safe(lambda: extractMonth(dateMatch.group(1)))
-            day = safe(lambda: extractDay(dateMatch.group(2)))
-            year = safe(lambda: extractYear(dateMatch.group(4)))
+            month = extractMonth(dateMatch.group(1))
+            if month is None:
+                failures['noMonth'] += 1
+                return None
+            day = extractDay(dateMatch.group(2))
+            year = extractYear(dateMatch.group(4))
 
             if year and day:
-                d = '/'.join(['%02d' % month, '%02d' % day, str(year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(4)))
+                d = prefixes[month][day] + _yearStrings(year)[0]
+                return (dateMatch.start(1), dateMatch.end(4), 'date', d, 0, None)
             elif day:
-                d = '/'.join(['%02d' % month, '%02d' % day, str(self.now.year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(2)))
+                d = anchors[month][day]
+                return (dateMatch.start(1), dateMatch.end(2), 'thisYear', d, 0, None)
             elif year:
-                d = '/'.join(['%02d' % month, 'XX', str(year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(4)))
+                d = prefixes[month][0] + _yearStrings(year)[0]
+                return (dateMatch.start(1), dateMatch.end(4), 'date', d, 0, None)
             else:
-                d = '/'.join(['%02d' % month, 'XX', str(self.now.year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(1)))
+                d = anchors[month][0]
+                return (dateMatch.start(1), dateMatch.end(1), 'thisYear', d, 0, None)
 
         def handleMatch2(dateMatch):
-            month = safe(lambda: extractMonth(dateMatch.group(2)))
-            day = safe(lambda: extractDay(dateMatch.group(1)))
-            year = safe(lambda: extractYear(dateMatch.group(4)))
+            month = extractMonth(dateMatch.group(2))
+            if month is None:
+                failures['noMonth'] += 1
+                return None
+            day = extractDay(dateMatch.group(1))
+            year = extractYear(dateMatch.group(4))
 
             if year and day:
-                d = '/'.join(['%02d' % month, '%02d' % day, str(year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(4)))
+                d = prefixes[month][day] + _yearStrings(year)[0]
+                return (dateMatch.start(1), dateMatch.end(4), 'date', d, 0, None)
             elif day:
-                d = '/'.join(['%02d' % month, '%02d' % day, str(self.now.year)])
-                return (d, range(dateMatch.start(1), dateMatch.end(2)))
+                d = anchors[month][day]
+                return (dateMatch.start(1), dateMatch.end(2), 'thisYear', d, 0, None)
             elif year:
-                d = '/'.join(['%02d' % month, 'XX', str(year)])
-                return (d, range(dateMatch.start(2), dateMatch.end(4)))
+                d = prefixes[month][0] + _yearStrings(year)[0]
+                return (dateMatch.start(2), dateMatch.end(4), 'date', d, 0, None)
             else:
-                d = '/'.join(['%02d' % month, 'XX', str(self.now.year)])
-                return (d, range(dateMatch.start(2), dateMatch.end(2)))
+                d = anchors[month][0]
+                return (dateMatch.start(2), dateMatch.end(2), 'thisYear', d, 0, None)
 
         def handleMatch3(dateMatch):
-            month, day, year = dateMatch.group(2).split('/')
-            month = int(month)
-            day = int(day)
-            year = int(year)
-            try:
-                datetime.datetime(year, month, day)
-                d = '/'.join(['%02d' % month, '%02d' % day, str(year)])
-                return (d, range(dateMatch.start(2), dateMatch.end(2)))
-            except:
+            month = self.__dayNumbers__.get(dateMatch.group(2))
+            day = self.__dayNumbers__.get(dateMatch.group(3))
+            year = years.get(dateMatch.group(4))
+            # Zeros, or digits outside ASCII
+            if month is None:
+                month = int(dateMatch.group(2))
+            if day is None:
+                day = int(dateMatch.group(3))
+            if year is None:
+                year = int(dateMatch.group(4))
+            if not (1 <= month <= 12) or day < 1 or \
+                    year < datetime.MINYEAR or \
+                    (day > self.__monthLengths__[month] and not
+                     (month == 2 and day == 29 and calendar.isleap(year))):
+                failures['invalidDate'] += 1
                 return None
+            d = prefixes[month][day] + _yearStrings(year)[0]
+            return (dateMatch.start(1), dateMatch.end(1), 'date', d, 0, None)
 
         def handleMatch4(dateMatch):
-            if extractYear(dateMatch.group(1)):
-                return ('XX/XX/%d' % extractYear(dateMatch.group(1)),
-                        range(dateMatch.start(1), dateMatch.end(1)))
+            year = extractYear(dateMatch.group(1))
+            if year:
+                return (dateMatch.start(1), dateMatch.end(1), 'date',
+                        prefixes[0][0] + _yearStrings(year)[0], 0, None)
             else:
                 return None
 
         # format1 month, day, year
-        matches = self._dayRegex2.finditer(input)
-        Days = [safe(lambda: handleMatch(dateMatch)) for dateMatch in matches]
-
         # format2 day, month, year
-        matches = self._dayRegex3.finditer(input)
-        Days = self.combineDays(Days,
-                                [safe(lambda: handleMatch2(dateMatch)) for dateMatch in matches])
-
         # month/day/year
-        matches = self._dayRegex4.finditer(input)
-        Days = self.combineDays(Days,
-                                [safe(lambda: handleMatch3(dateMatch)) for dateMatch in matches])
-
         # only year
-        matches = self._dayRegex5.finditer(input)
-        Days = self.combineDays(Days,
-                                [safe(lambda: handleMatch4(dateMatch)) for dateMatch in matches])
-        return Days
+        # Generated lazily, so each hit can be resolved and dropped before
+        # the next match is handled
+        return [(handleMatch(m) for m in
+                 _within(self._dayRegex2.finditer(input), window)),
+                (handleMatch2(m) for m in
+                 _within(self._dayRegex3.finditer(input), window)),
+                (handleMatch3(m) for m in
+                 _within(self._dayRegex4.finditer(input), window)),
+                (handleMatch4(m) for m in
+                 _within(self._dayRegex5.finditer(input), window))]
 
     def extractIrrDays(self, input):
         """Extracts all day-related information from an input string.
@@ -273,18 +365,73 @@ class DateService(object):
             A list of datetime objects containing the extracted date from the
             input snippet, or an empty list if none found.
         """
-        def safe(exp):
-            """For safe evaluation of regex groups"""
-            try:
-                return exp()
-            except:
-                return None
+        return self.resolve(self._symbolicIrrDays(input))
+
+    def _symbolicIrrDays(self, input, times=None, window=None):
+        """Yields the symbolic hits behind extractIrrDays. Times of day
+        found by the same scan are appended to times, if supplied, as
+        (start, stop, kind, hour, minute) tuples: kind 'clock' for a time
+        of day with am/pm, 'plain' for one without, 'period' for the
+        default time of a part of the day and 'offset' for hours and
+        minutes from now. Only the matches
+        starting inside window, a (start, end) tuple, are handled if one
+        is supplied."""
+        failures = self.failures
+        lexicon = self.lexicon
+        service = NumberService()
+
+        def handleTime(dateMatch):
+            if dateMatch.group(15):
+                hour, minute = self.__timesOfDay__[dateMatch.group(15)]
+                return (dateMatch.start(15), dateMatch.end(15), 'period',
+                        hour, minute)
+            if dateMatch.group(9):
+                hour, minute = dateMatch.group(9).split(':')
+                hour = int(hour)
+                minute = int(minute)
+                kind = 'plain'
+                if dateMatch.group(10):
+                    kind = 'clock'
+                    if not (1 <= hour <= 12):
+                        failures['invalidTime'] += 1
+                        return None
+                    hour %= 12
+                    if dateMatch.group(10) == 'pm':
+                        hour += 12
+                if hour > 23 or minute > 59:
+                    failures['invalidTime'] += 1
+                    return None
+                return (dateMatch.start(9), dateMatch.end(4), kind,
+                        hour, minute)
+
+            # in N hours (and M minutes)
+            hours = minutes = 0
+            for number, unit in ((11, 12), (13, 14)):
+                words = dateMatch.group(number)
+                if not words:
+                    continue
+                # 'a half' and 'a quarter' only parse as 'a two' and
+                # 'a four', i.e. 3 and 5
+                if words.rsplit(' ', 1)[-1] in service.__fractions__ and \
+                        ' and ' not in words:
+                    failures['badNumber'] += 1
+                    return None
+                value = service.tryParse(words)
+                if value is None or not math.isfinite(value):
+                    failures['badNumber'] += 1
+                    return None
+                if dateMatch.group(unit).startswith('hour'):
+                    hours += value
+                else:
+                    minutes += value
+            return (dateMatch.start(4), dateMatch.end(4), 'offset',
+                    hours, minutes)
 
         def extractDayOfWeek(dateMatch):
-            if dateMatch.group(8) in self.__daysOfWeek__:
-                return self.__daysOfWeek__.index(dateMatch.group(8))
-            if dateMatch.group(6) in self.__daysOfWeek__:
-                return self.__daysOfWeek__.index(dateMatch.group(6))
+            if dateMatch.group(8) in lexicon.weekdays:
+                return lexicon.weekdays[dateMatch.group(8)]
+            if dateMatch.group(6) in lexicon.weekdays:
+                return lexicon.weekdays[dateMatch.group(6)]
 
         def extractDaysFrom(dateMatch):
             if not dateMatch.group(1):
@@ -293,72 +440,93 @@ class DateService(object):
             def numericalPrefix(dateMatch):
                 # Grab 'three' of 'three weeks from'
                 prefixStr = input[max(0, dateMatch.start() - 50):dateMatch.start()]
-                prefixStr = re.search('^[0-9a-zA-Z- ,]+', prefixStr[::-1]).group()[::-1]
-                prefixAll = prefixStr.split(' ')
+                prefixStr = re.search('^[0-9a-zA-Z- ,]+', prefixStr[::-1])
+                if prefixStr is None:
+                    failures['noPrefix'] += 1
+                    return (1, 0)
+                prefixAll = prefixStr.group()[::-1].split(' ')
                 prefixAll.reverse()
                 prefix = [(idx, x) for idx, x in enumerate(prefixAll)
                           if x != '' and x != 'and' and x != ',']
                 # Generate best guess number
-                service = NumberService()
                 res = (1, 0)
                 for i in range(len(prefix)):
                     num = ' '.join([st for idx, st in prefix[i::-1]])
-                    print(num)
-                    if not service.isValid(num):
+                    value = service.tryParse(num)
+                    if value is None:
                         return res
                     else:
-                        res = (service.parse(num),
+                        res = (value,
                                -len(' '.join(prefixAll[:prefix[i][0] + 1])))
                 return res
 
             factor, off = numericalPrefix(dateMatch)
-            if (dateMatch.group(3) == 'before' or dateMatch.group(3) == 'ago'):
-                factor = -factor
+            if not math.isfinite(factor):
+                failures['badNumber'] += 1
+                return 0
+            direction = lexicon.directions.get(dateMatch.group(3))
+            if direction is None:
+                failures['unknownDirection'] += 1
+                return 0
+            factor *= direction
 
-            if dateMatch.group(2) == 'week':
+            unit = lexicon.units.get(dateMatch.group(2), (None, False))[0]
+            if unit == 'week':
                 return (factor * 7, off)
-            elif dateMatch.group(2) == 'day':
+            elif unit == 'day':
                 return (factor * 1, off)
-            elif dateMatch.group(2) == 'month':
+            elif unit == 'month':
                 return (factor * 30, off)
-            elif dateMatch.group(2) == 'year':
+            elif unit == 'year':
                 return (factor * 365, off)
-
-        def extractMonth(dayMatch):
-            if dayMatch[:3] in self.__startMonths__:
-                return self.__startMonths__.index(dayMatch[:3]) + 1
+            failures['unknownUnit'] += 1
+            return 0
 
         def handleMatch(dateMatch):
-            def generateDate(year, month):
-                '''generate date from year and month'''
-                while (month <= 0):
-                    year -= 1
-                    month += 12
-                while (month > 12):
-                    year += 1
-                    month -= 12
-                return '%02d/XX/%d' % (month, year)
-
-            days_from = safe(lambda: extractDaysFrom(dateMatch))
-            today = safe(lambda: dateMatch.group(4) in self.__todateMatches__)
-            tomorrow = safe(lambda: dateMatch.group(4)
-                            in self.__tomorrowMatches__)
-            yesterday = safe(lambda: dateMatch.group(4)
-                             in self.__yesterdateMatches__)
-            next_week = safe(lambda: dateMatch.group(5) == 'next')
-            last_week = safe(lambda: dateMatch.group(5) == 'last')
-            isMonth = safe(lambda: dateMatch.group(6) == 'month' or
-                         dateMatch.group(2) == 'month')
-            isYear = safe(lambda: dateMatch.group(6) == 'year' or
-                         dateMatch.group(2) == 'year')
-            month_of_year = safe(lambda:extractMonth(dateMatch.group(7)))
-            day_of_week = safe(lambda: extractDayOfWeek(dateMatch))
-
-            if not dateMatch:
+            # Nothing but the empty match at this position
+            if not dateMatch.group(1) and not dateMatch.group(4):
                 return None
 
+            isTime = dateMatch.group(9) or dateMatch.group(11) or \
+                dateMatch.group(15)
+            if times is not None:
+                if isTime:
+                    time = handleTime(dateMatch)
+                    if time:
+                        times.append(time)
+                elif lexicon.periods.get(dateMatch.group(6)) in \
+                        self.__timesOfDay__:
+                    hour, minute = self.__timesOfDay__[
+                        lexicon.periods[dateMatch.group(6)]]
+                    times.append((dateMatch.start(6), dateMatch.end(6),
+                                  'period', hour, minute))
+                elif lexicon.dayParts.get(dateMatch.group(4)) in \
+                        self.__timesOfDay__:
+                    hour, minute = self.__timesOfDay__[
+                        lexicon.dayParts[dateMatch.group(4)]]
+                    times.append((dateMatch.start(4), dateMatch.end(4),
+                                  'period', hour, minute))
+            if isTime:
+                if not dateMatch.group(1):
+                    return None
+
+            days_from = extractDaysFrom(dateMatch)
+            unit, plural = lexicon.units.get(dateMatch.group(2), (None, False))
+            period = lexicon.periods.get(dateMatch.group(6))
+            relative = lexicon.relative.get(dateMatch.group(5))
+            next_week = relative == 1
+            last_week = relative == -1
+            # today, tomorrow, last night, ...
+            day_offset = lexicon.deictic.get(dateMatch.group(4))
+            if period in self.__partsOfDay__:
+                day_offset = relative
+            isMonth = period == 'month' or unit == 'month'
+            isYear = period == 'year' or unit == 'year'
+            month_of_year = lexicon.months.get(dateMatch.group(7))
+            day_of_week = extractDayOfWeek(dateMatch)
+
             stIdx = dateMatch.start()
-            edIdx = dateMatch.end()
+            edIdx = dateMatch.start(4) if isTime else dateMatch.end()
 
             if days_from:
                 days_from, off = days_from
@@ -370,77 +538,159 @@ class DateService(object):
                 if (st == 'year') and (abs(days) == 365): return True
                 return False
             if days_from and dateMatch.group(1) and \
-            (ck(days_from, dateMatch.group(2)) == 1) and \
-                    ('s' in dateMatch.group(1)):
+            (ck(days_from, unit) == 1) and plural:
+                failures['pluralMismatch'] += 1
                 return None
 
             if (isYear):
-                year = self.now.year
                 if days_from:
-                    year += days_from // 365
+                    years = days_from // 365
                 else:
-                    if next_week:
-                        year += 1
-                    elif last_week:
-                        year -= 1
-                return ('XX/XX/%d' % year, range(stIdx, edIdx))
+                    years = 1 if next_week else -1 if last_week else 0
+                return (stIdx, edIdx, 'offset', None, years, 'year')
             elif (isMonth):
-                year = self.now.year
-                month = self.now.month
                 if days_from:
-                    month += days_from // 30
+                    months = days_from // 30
                 else:
-                    if next_week:
-                        month += 1
-                    elif last_week:
-                        month -= 1
-                return (generateDate(year, month), range(stIdx, edIdx))
+                    months = 1 if next_week else -1 if last_week else 0
+                return (stIdx, edIdx, 'offset', None, months, 'month')
             elif (month_of_year):
-                year = self.now.year
-                month = self.now.month
-                if next_week:
-                    if month >= month_of_year:
-                        year += 1
-                elif last_week:
-                    if month <= month_of_year:
-                        year -= 1
-                month = month_of_year
-                return (generateDate(year, month), range(stIdx, edIdx))
-            # Convert extracted terms to datetime object
-            elif today:
-                d = self.now
-            elif tomorrow:
-                d = self.now + datetime.timedelta(days=1)
-            elif yesterday:
-                d = self.now - datetime.timedelta(days=-1)
-            elif (not day_of_week is None) or (dateMatch.group(6) == 'week'):
-                num_days_away = 0
+                direction = 1 if next_week else -1 if last_week else 0
+                return (stIdx, edIdx, 'monthName', month_of_year, direction,
+                        'month')
+            elif day_offset is not None:
+                days = day_offset
+            elif (not day_of_week is None) or (period == 'week'):
+                days = 7 if next_week else -7 if last_week else 0
                 if not day_of_week is None:
-                    current_day_of_week = self.now.weekday()
-                    num_days_away = (day_of_week - current_day_of_week) % 7
-
-                if next_week:
-                    num_days_away += 7
-                if last_week:
-                    num_days_away -= 7
-
-                d = self.now + \
-                    datetime.timedelta(days=num_days_away)
+                    return (stIdx, edIdx, 'weekday', day_of_week,
+                            days + days_from, 'day')
             elif days_from:
-                d = self.now
+                days = 0
             else:
+                failures['noDate'] += 1
                 return None
 
-            if days_from:
-                d += datetime.timedelta(days=days_from)
-            year, mon, day = d.isoformat().split('-')
-            d = '/'.join([mon, day[:2], year])
+            return (stIdx, edIdx, 'offset', None, days + days_from, 'day')
+
+        for dateMatch in _within(self._dayRegex.finditer(input), window):
+            day = handleMatch(dateMatch)
+            if day:
+                yield day
+
+    def _resolveHit(self, hit):
+        """Resolves one symbolic hit against self.now; returns a
+        (date, range) tuple, or None if the hit is None or the date falls
+        outside the supported range."""
+        if hit is None:
+            return None
+        start, stop, kind, anchor, amount, unit = hit
+
+        if kind == 'date':
+            return (anchor, range(start, stop))
+        elif kind == 'thisYear':
+            return (anchor + _yearStrings(self.now.year)[1],
+                    range(start, stop))
+        elif unit == 'year':
+            return (self.__prefixes__[0][0] +
+                    _yearStrings(self.now.year + amount)[0],
+                    range(start, stop))
+        elif unit == 'month':
+            year = self.now.year
+            month = self.now.month
+            if kind == 'monthName':
+                if amount > 0 and month >= anchor:
+                    year += 1
+                elif amount < 0 and month <= anchor:
+                    year -= 1
+                month = anchor
+            else:
+                month += amount
+            years, month = divmod(month - 1, 12)
+            return (self.__prefixes__[int(month) + 1][0] +
+                    _yearStrings(year + years)[0], range(start, stop))
+
+        if kind == 'weekday':
+            amount += (anchor - self.now.weekday()) % 7
+        if not (1 <= self.now.toordinal() + amount
+                <= datetime.date.max.toordinal()):
+            self.failures['outOfRange'] += 1
+            return None
+        d = self.now + datetime.timedelta(days=amount)
+        return (self._numericDay(d), range(start, stop))
+
+    def _numericDay(self, d):
+        """Returns the 'MM/DD/YYYY' string of a date."""
+        if d.year < 1000:
+            return '%02d/%02d/%04d' % (d.month, d.day, d.year)
+        return self.__prefixes__[d.month][d.day] + _yearStrings(d.year)[0]
+
+    def resolve(self, hits):
+        """Resolves symbolic hits, as returned by extractSymbolic, against
+        self.now without scanning any text.
+
+        Args:
+            hits (list): Symbolic hits.
+
+        Returns:
+            A list of (date, range) tuples, as extractDates would have
+            returned for the same text with this service's now.
+        """
+        Days = []
+        for hit in hits:
+            day = self._resolveHit(hit)
+            if day:
+                Days.append(day)
+        return Days
 
-            return (d, range(stIdx, edIdx))
+    def extractSymbolic(self, input, irregular=True):
+        """Extract date information from an input string in a symbolic form
+        that does not depend on the current date, so it can be stored and
+        later resolved against any now with resolve.
 
-        matches = self._dayRegex.finditer(input)
+        Each hit is a (start, stop, kind, anchor, amount, unit) tuple of
+        plain values:
 
-        return [safe(lambda: handleMatch(dateMatch)) for dateMatch in matches]
+            'date': anchor is the complete 'MM/DD/YYYY' date.
+            'thisYear': anchor is 'MM/DD' (or 'MM/XX') in now's year.
+            'offset': amount units ('day', 'month' or 'year') from now,
+                negative amounts pointing to the past.
+            'monthName': the month anchor (1-12) of the next (amount 1),
+                last (amount -1) or current (amount 0) year.
+            'weekday': amount days from the coming weekday anchor (0 is
+                Monday).
+
+        Args:
+            input (str): Input string to be parsed.
+            irregular: get irregular date
+
+        Returns:
+            A list of symbolic hits, one per date extractDates would find.
+        """
+        input = self._preprocess(input)
+        candidates = self._symbolicDays(input)
+        if (irregular):
+            candidates.append(self._symbolicIrrDays(input))
+        return [hit for day, hit, format in self._mergeHits(candidates)]
+
+    def _mergeHits(self, candidates):
+        """Resolves the symbolic hits of each format and merges them in
+        order, as extractDays does; returns a (day, hit, format) tuple for
+        each day kept, where day is the resolved (date, range) tuple and
+        format the index of its list in candidates."""
+        # Overlaps are settled on the resolved dates, whose 'XX' parts and
+        # spans do not depend on now
+        found = {}
+        Days = []
+        for format, hits in enumerate(candidates):
+            days = []
+            for hit in hits:
+                day = self._resolveHit(hit)
+                if day:
+                    found[id(day)] = (day, hit, format)
+                    days.append(day)
+            Days = self.combineDays(Days, days)
+        return [found[id(day)] for day in Days]
 
     def extractDay(self, input):
         """Returns the first time-related date found in the input string,
@@ -450,7 +700,7 @@ class DateService(object):
             return day[0]
         return None
 
-    def extractDates(self, input, irregular=True):
+    def extractDates(self, input, irregular=True, times=False):
         """Extract semantic date information from an input string.
         In effect, runs both parseDay and parseTime on the input
         string and merges the results to produce a comprehensive
@@ -459,17 +709,198 @@ class DateService(object):
         Args:
             input (str): Input string to be parsed.
             irregular: get irregular date
+            times: also extract times of day (e.g., '10:30 pm', 'morning',
+                'in 2 hours'), in the same scan as the irregular dates
 
         Returns:
             A list of datetime objects containing the extracted dates from the
-            input snippet, or an empty list if not found.
+            input snippet, or an empty list if not found. With times=True,
+            each tuple gets a third 'HH:MM' element (None if no time was
+            found near the date), and times near no date are returned on
+            their own with the date they fall on.
         """
         input = self._preprocess(input)
 
         days = self.extractDays(input)
+        if not times:
+            if (irregular):
+                days = self.combineDays(days, self.extractIrrDays(input))
+            return days
+
+        timeHits = []
+        irrDays = self.resolve(self._symbolicIrrDays(input, timeHits))
         if (irregular):
-            days = self.combineDays(days, self.extractIrrDays(input))
-        return days
+            days = self.combineDays(days, irrDays)
+        return self._attachTimes(days, timeHits)
+
+    def _attachTimes(self, days, times):
+        """Gives each time hit to the nearest date hit that can take it
+        (see _mergeTime), if it lies within __timeWindow__ characters;
+        returns the (date, range, time) tuples ordered by position. Hours
+        and minutes from now are always returned on their own, with the
+        date they fall on."""
+        starts = [day[1].start for day in days]
+        attached = [None] * len(days)
+        Days = []
+        for start, stop, kind, hour, minute in times:
+            moment = None
+            if kind == 'offset':
+                offset = hour * 60 + minute
+                if not (1 <= self.now.toordinal() + offset / 1440.0
+                        <= datetime.date.max.toordinal()):
+                    self.failures['outOfRange'] += 1
+                    continue
+                moment = self.now + datetime.timedelta(minutes=offset)
+                hour, minute = moment.hour, moment.minute
+            time = (kind, hour, minute)
+
+            nearest = None
+            gap = self.__timeWindow__
+            i = bisect.bisect_right(starts, start)
+            for j in (i - 1, i):
+                if 0 <= j < len(days) and \
+                        self._mergeTime(attached[j], time) is not None:
+                    span = days[j][1]
+                    distance = max(span.start - stop, start - span.stop, 0)
+                    if distance <= gap:
+                        nearest, gap = j, distance
+            if nearest is not None:
+                attached[nearest] = self._mergeTime(attached[nearest], time)
+            else:
+                d = moment or self.now
+                Days.append((self._numericDay(d), range(start, stop),
+                             '%02d:%02d' % (hour, minute)))
+
+        Days.extend((day[0], day[1], time and '%02d:%02d' % time[1:])
+                    for day, time in zip(days, attached))
+        Days.sort(key=lambda day: day[1].start)
+        return Days
+
+    def _mergeTime(self, current, time):
+        """Returns the (kind, hour, minute) time of a date holding the time
+        current (None if it has none yet) once it is also given time, or
+        None if it cannot take it. A time of day replaces the default time
+        of a part of the day; one without am/pm is moved to the pm in the
+        afternoon and evening, so 'this evening at 7:15' is at 19:15."""
+        # An offset falls on its own date
+        if time[0] == 'offset':
+            return None
+        if current is None:
+            return time
+        if time[0] == 'period':
+            current, time = time, current
+        if current[0] != 'period' or time[0] not in ('clock', 'plain'):
+            return None
+        kind, hour, minute = time
+        if kind == 'plain' and 1 <= hour < 12 and current[1] >= 12:
+            hour += 12
+        return ('clock', hour, minute)
+
+    def extractDatesShared(self, input, irregular=True, processes=None,
+                           segmentSize=1 << 20, overlap=1024):
+        """Extract semantic date information from a single large input
+        string using several worker processes.
+
+        The preprocessed text is placed once in shared memory. Each worker
+        scans one segment plus `overlap` characters of context on either
+        side, and keeps the candidates that start inside its segment; the
+        candidates are then stitched and merged exactly as in extractDates.
+        The numeric and year formats find the same matches wherever a scan
+        starts, so the result is identical to extractDates as long as no
+        single match (including the 50 characters scanned for a numerical
+        prefix) is longer than overlap, and no run of back-to-back matches
+        of a month-name format, such as 'may may may ...', is either. The
+        failures of the matches starting inside each segment are added to
+        self.failures.
+
+        Args:
+            input (str): Input string to be parsed.
+            irregular: get irregular date
+            processes (int): Number of worker processes. Uses
+                os.cpu_count() if none is supplied.
+            segmentSize (int): Number of characters scanned per task.
+            overlap (int): Characters of context shared by neighbouring
+                segments.
+
+        Returns:
+            A list of (date, range) tuples like extractDates, with ranges
+            in offsets of the whole input.
+        """
+        input = self._preprocess(input)
+        if len(input) <= segmentSize:
+            days = self.extractDays(input)
+            if (irregular):
+                days = self.combineDays(days, self.extractIrrDays(input))
+            return days
+
+        if input.isascii():
+            codec, width = 'ascii', 1
+        else:
+            codec, width = 'utf-32-le', 4
+        data = input.encode(codec)
+
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            del data
+            tasks = [(shm.name, codec, width, len(input), start,
+                      min(start + segmentSize, len(input)), overlap,
+                      self.tz, self.now, self.lexicon.locales, irregular)
+                     for start in range(0, len(input), segmentSize)]
+            with multiprocessing.Pool(processes) as pool:
+                results = pool.map(_scanSegment, tasks)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        segments = []
+        for candidates, failures in results:
+            segments.append(candidates)
+            self.failures.update(failures)
+
+        candidates = [[hit for segment in format for hit in segment]
+                      for format in zip(*segments)]
+        return [day for day, hit, format in self._mergeHits(candidates)]
+
+    def indexDates(self, input, irregular=True):
+        """Extract the dates of an input string into a DateIndex.
+
+        Args:
+            input (str): Input string to be parsed.
+            irregular: get irregular date
+
+        Returns:
+            A DateIndex over the extracted dates.
+        """
+        return DateIndex(self.extractDates(input, irregular))
+
+    def aggregateDates(self, inputs, irregular=True, aggregate=None):
+        """Extract dates from a stream of documents into a DateAggregate,
+        without keeping the individual hits.
+
+        Args:
+            inputs (iterable): Input strings to be parsed.
+            irregular: get irregular date
+            aggregate (DateAggregate): An optional aggregate to update.
+                A new one is created if none is supplied.
+
+        Returns:
+            The updated DateAggregate.
+        """
+        if aggregate is None:
+            aggregate = DateAggregate()
+        for input in inputs:
+            input = self._preprocess(input)
+            candidates = self._symbolicDays(input)
+            if (irregular):
+                candidates.append(self._symbolicIrrDays(input))
+
+            for day, hit, format in self._mergeHits(candidates):
+                # Regular formats fill a missing year with self.now.year
+                relative = format == 4 or hit[2] == 'thisYear'
+                aggregate.add(day[0], format, relative)
+            aggregate.documents += 1
+        return aggregate
 
     def extractDate(self, input):
         """Returns the first date found in the input string, or None if not
@@ -496,17 +927,28 @@ class DateService(object):
             A string representation of the input day, ignoring any time-related
             information.
         """
-        def sameDay(d1, d2):
-            d = d1.day == d2.day
-            m = d1.month == d2.month
-            y = d1.year == d2.yaer
-            return d and m and y
-
-        tom = self.now + datetime.timedelta(days=1)
-
-        if sameDay(day, self.now):
+        cache = self._dayStrings()
+        key = (day.toordinal(), prefix, weekday)
+        dayString = cache.get(key)
+        if dayString is None:
+            dayString = cache[key] = self._renderDay(day, prefix, weekday)
+        return dayString
+
+    def _dayStrings(self):
+        """Returns the convertDay cache, emptied whenever the reference day
+        (self.now) has changed since it was filled."""
+        today = self.now.toordinal()
+        if self._cacheDay != today:
+            self._cacheDay = today
+            self._dayCache = {}
+        return self._dayCache
+
+    def _renderDay(self, day, prefix, weekday):
+        today = self.now.toordinal()
+
+        if day.toordinal() == today:
             return "today"
-        elif sameDay(day, tom):
+        elif day.toordinal() == today + 1:
             return "tomorrow"
 
         if weekday:
@@ -531,6 +973,13 @@ class DateService(object):
             A string representation of the input time, ignoring any day-related
             information.
         """
+        key = (time.hour, time.minute)
+        timeString = self._timeCache.get(key)
+        if timeString is None:
+            timeString = self._timeCache[key] = self._renderTime(time)
+        return timeString
+
+    def _renderTime(self, time):
         # if ':00', ignore reporting minutes
         m_format = ""
         if time.minute:
@@ -566,8 +1015,665 @@ class DateService(object):
         timeString = self.convertTime(date)
         return dayString + " at " + timeString
 
+    def convertDays(self, days, prefix="", weekday=False):
+        """Convert many datetime objects representing days at once. Each
+        distinct day is rendered only once relative to self.now, so long
+        lists that repeat days cost little more than a dictionary lookup
+        per entry.
 
-def extractDates(input, tz=None, now=None, irregular=True):
+        Args:
+            days (iterable): datetime.date objects to be converted.
+            prefix (str): As in convertDay.
+            weekday (bool): As in convertDay.
+
+        Returns:
+            A list with the string representation of each day.
+        """
+        cache = self._dayStrings()
+        render = self._renderDay
+        dayStrings = []
+        for day in days:
+            key = (day.toordinal(), prefix, weekday)
+            dayString = cache.get(key)
+            if dayString is None:
+                dayString = cache[key] = render(day, prefix, weekday)
+            dayStrings.append(dayString)
+        return dayStrings
+
+    def convertDates(self, dates, prefix="", weekday=False):
+        """Convert many datetime objects at once, like convertDate, sharing
+        the day and time renderings between entries.
+
+        Args:
+            dates (iterable): datetime.datetime objects to be converted.
+            prefix (str): As in convertDate.
+            weekday (bool): As in convertDate.
+
+        Returns:
+            A list with the string representation of each day and time.
+        """
+        dates = list(dates)
+        convertTime = self.convertTime
+        return [dayString + " at " + convertTime(date) for dayString, date in
+                zip(self.convertDays(dates, prefix, weekday), dates)]
+
+
+class Lexicon(object):
+
+    """Month, weekday, relative and ordinal words of one or more locales,
+    compiled together into trie-shaped regex alternations, so that matching
+    the words of several locales costs about as much as matching one.
+
+    Each locale table lists months (full name first, then abbreviations,
+    which may also end with a '.'), weekdays from Monday, relative words
+    (next/this/last as 1/0/-1), periods, units with their plural flag,
+    directions (as -1/1), deictic words (as day offsets), the part of the
+    day some deictic words imply and day descriptors, each mapped to the English value the handlers work with.
+    Word order follows English, so a locale's relative expressions are
+    only found where they read the same way.
+
+    Args:
+        locales (tuple): Keys of __locales__. When a word means different
+            things in several locales, the first locale wins.
+
+    Attributes:
+        months, weekdays, relative, periods, units, directions, deictic,
+        dayParts, descriptors: dicts from every word to its value.
+        days: dict from every day token, descriptors and zero-padded
+            digits alike, to its day.
+        patterns: dict from each of those names to a regex alternation
+            matching all of its words.
+    """
+
+    __locales__ = {
+        'en': {
+            'months': [('january', 'jan'), ('february', 'feb'),
+                       ('march', 'mar'), ('april', 'apr'), ('may', 'may'),
+                       ('june', 'jun'), ('july', 'jul'), ('august', 'aug'),
+                       ('september', 'sep', 'sept'), ('october', 'oct'),
+                       ('november', 'nov'), ('december', 'dec')],
+            'weekdays': ['monday', 'tuesday', 'wednesday', 'thursday',
+                         'friday', 'saturday', 'sunday'],
+            'relative': {'next': 1, 'this': 0, 'last': -1},
+            'periods': {'morning': 'morning', 'afternoon': 'afternoon',
+                        'evening': 'evening', 'night': 'night',
+                        'week': 'week', 'month': 'month', 'year': 'year'},
+            'units': {'day': ('day', False), 'days': ('day', True),
+                      'week': ('week', False), 'weeks': ('week', True),
+                      'month': ('month', False), 'months': ('month', True),
+                      'year': ('year', False), 'years': ('year', True)},
+            'directions': {'ago': -1, 'before': -1, 'from': 1},
+            'deictic': {'tomorrow': 1, 'now': 0, 'tonight': 0, 'today': 0,
+                        'yesterday': -1},
+            'dayParts': {'tonight': 'evening'},
+            'descriptors': DateService.__dateDescriptors__,
+        },
+        'de': {
+            'months': [('januar', 'jan'), ('februar', 'feb'),
+                       ('märz', 'mär'), ('april', 'apr'), ('mai',),
+                       ('juni', 'jun'), ('juli', 'jul'), ('august', 'aug'),
+                       ('september', 'sep', 'sept'), ('oktober', 'okt'),
+                       ('november', 'nov'), ('dezember', 'dez')],
+            'weekdays': ['montag', 'dienstag', 'mittwoch', 'donnerstag',
+                         'freitag', 'samstag', 'sonntag'],
+            'relative': {'nächste': 1, 'nächsten': 1, 'nächster': 1,
+                         'nächstes': 1, 'diese': 0, 'diesen': 0,
+                         'dieser': 0, 'dieses': 0, 'letzte': -1,
+                         'letzten': -1, 'letzter': -1, 'letztes': -1},
+            'periods': {'nachmittag': 'afternoon', 'abend': 'evening',
+                        'nacht': 'night', 'woche': 'week',
+                        'monat': 'month', 'jahr': 'year'},
+            'units': {},
+            'directions': {},
+            'deictic': {'morgen': 1, 'jetzt': 0, 'heute': 0,
+                        'gestern': -1},
+            'dayParts': {},
+            'descriptors': {'erste': 1, 'ersten': 1, 'zweite': 2,
+                            'zweiten': 2, 'dritte': 3, 'dritten': 3},
+        },
+        'fr': {
+            'months': [('janvier', 'janv'), ('février', 'févr'),
+                       ('mars',), ('avril', 'avr'), ('mai',), ('juin',),
+                       ('juillet', 'juil'), ('août',),
+                       ('septembre', 'sept'), ('octobre', 'oct'),
+                       ('novembre', 'nov'), ('décembre', 'déc')],
+            'weekdays': ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi',
+                         'samedi', 'dimanche'],
+            'relative': {'prochain': 1, 'prochaine': 1, 'ce': 0,
+                         'cette': 0, 'dernier': -1, 'dernière': -1},
+            'periods': {'matin': 'morning', 'soir': 'evening',
+                        'nuit': 'night', 'semaine': 'week', 'mois': 'month',
+                        'année': 'year'},
+            'units': {},
+            'directions': {},
+            'deictic': {'demain': 1, 'maintenant': 0, 'ce soir': 0,
+                        "aujourd'hui": 0, 'hier': -1},
+            'dayParts': {'ce soir': 'evening'},
+            'descriptors': {'premier': 1, '1er': 1},
+        },
+        'es': {
+            'months': [('enero', 'ene'), ('febrero', 'feb'),
+                       ('marzo', 'mar'), ('abril', 'abr'), ('mayo',),
+                       ('junio', 'jun'), ('julio', 'jul'), ('agosto',),
+                       ('septiembre', 'sep', 'sept'), ('octubre', 'oct'),
+                       ('noviembre', 'nov'), ('diciembre', 'dic')],
+            'weekdays': ['lunes', 'martes', 'miércoles', 'jueves',
+                         'viernes', 'sábado', 'domingo'],
+            'relative': {'próximo': 1, 'próxima': 1, 'este': 0, 'esta': 0},
+            'periods': {'tarde': 'afternoon', 'noche': 'night',
+                        'semana': 'week', 'mes': 'month', 'año': 'year'},
+            'units': {},
+            'directions': {},
+            'deictic': {'mañana': 1, 'ahora': 0, 'hoy': 0, 'ayer': -1},
+            'dayParts': {},
+            'descriptors': {'primero': 1},
+        },
+    }
+
+    def __init__(self, locales=('en',)):
+        self.locales = tuple(locales)
+        self.months = {}
+        self.weekdays = {}
+        self.relative = {}
+        self.periods = {}
+        self.units = {}
+        self.directions = {}
+        self.deictic = {}
+        self.dayParts = {}
+        self.descriptors = {}
+        for locale in self.locales:
+            table = self.__locales__[locale]
+            for month, words in enumerate(table['months'], 1):
+                for i, word in enumerate(words):
+                    self.months.setdefault(word, month)
+                    if i:
+                        self.months.setdefault(word + '.', month)
+            for weekday, word in enumerate(table['weekdays']):
+                self.weekdays.setdefault(word, weekday)
+            for name in ('relative', 'periods', 'units', 'directions',
+                         'deictic', 'dayParts', 'descriptors'):
+                words = getattr(self, name)
+                for word, value in table[name].items():
+                    words.setdefault(word, value)
+
+        # Every day token, descriptor or digits, for a single lookup
+        self.days = dict(DateService.__dayNumbers__)
+        self.days.update(self.descriptors)
+
+        self.patterns = dict(
+            (name, _trieRegex(getattr(self, name)))
+            for name in ('months', 'weekdays', 'relative', 'periods',
+                         'units', 'directions', 'deictic'))
+
+
+class DateIndex(object):
+
+    """Index over the dates extracted from one document, answering span and
+    date-range queries in O(log n + k) with bisect.
+
+    Spans are kept as array('q') columns of starts and running-maximum
+    stops in document order; dates as sorted columns of first/last day
+    ordinals (a partial 'XX' date covers its whole month or year).
+
+    Args:
+        days (list): (date, range) tuples, as returned by extractDates.
+    """
+
+    # Longest period, in days, a partial date can cover
+    __maxPeriod__ = 365
+
+    def __init__(self, days):
+        self.days = sorted(days, key=lambda day: day[1].start)
+        self.starts = array('q')
+        self.stops = array('q')
+        stop = 0
+        for day in self.days:
+            stop = max(stop, day[1].stop)
+            self.starts.append(day[1].start)
+            self.stops.append(stop)
+
+        periods = []
+        for i, day in enumerate(self.days):
+            period = _ordinalRange(day[0])
+            if period:
+                periods.append((period[0], period[1], i))
+        periods.sort()
+        self.firsts = array('q', [period[0] for period in periods])
+        self.lasts = array('q', [period[1] for period in periods])
+        self.order = array('q', [period[2] for period in periods])
+
+    def __len__(self):
+        return len(self.days)
+
+    def inSpan(self, start, stop):
+        """Returns the hits overlapping the character range [start, stop),
+        in document order."""
+        i = bisect.bisect_right(self.stops, start)
+        j = bisect.bisect_left(self.starts, stop)
+        return [self.days[k] for k in range(i, j)
+                if self.days[k][1].stop > start]
+
+    def between(self, first, last, partial=False):
+        """Returns the hits whose dates fall between two days.
+
+        Args:
+            first (datetime.date): First day of the range.
+            last (datetime.date): Last day of the range, inclusive.
+            partial (bool): If True, partial dates are returned when their
+                month or year overlaps the range, rather than only when it
+                lies inside it.
+
+        Returns:
+            The matching (date, range) tuples, in document order.
+        """
+        first = first.toordinal()
+        last = last.toordinal()
+        if partial:
+            i = bisect.bisect_left(self.firsts, first - self.__maxPeriod__)
+        else:
+            i = bisect.bisect_left(self.firsts, first)
+        j = bisect.bisect_right(self.firsts, last)
+        if partial:
+            hits = [self.order[k] for k in range(i, j)
+                    if self.lasts[k] >= first]
+        else:
+            hits = [self.order[k] for k in range(i, j)
+                    if self.lasts[k] <= last]
+        hits.sort()
+        return [self.days[k] for k in hits]
+
+
+class CorpusIndexWriter(object):
+
+    """Builds an on-disk inverted index from dates to the documents that
+    mention them, readable with CorpusIndex.
+
+    The index is a directory of immutable segment files. Each flush writes
+    one more segment, so a corpus can be appended to at any time. Keys are
+    first day ordinal * 4 + precision (0 for a day, 1 for an 'XX' day, 2
+    for an 'XX' month), so partial dates get their own month and year
+    buckets. A segment file holds, in native byte order:
+
+        magic       8 bytes, __magic__
+        nkeys       int64
+        npostings   int64
+        keys        nkeys int64, sorted
+        offsets     nkeys + 1 int64, into postings, per key
+        postings    npostings * (document id, start, stop) int64
+
+    Only one writer may append to a directory at a time.
+
+    Args:
+        directory (str): Directory holding the segment files. Created if
+            it does not exist.
+        service (DateService): Service used for extraction. A new one is
+            created if none is supplied.
+        flushSize (int): Number of postings buffered before a segment is
+            written.
+    """
+
+    __magic__ = b'DATEIDX1'
+
+    def __init__(self, directory, service=None, flushSize=1 << 20):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.service = service or DateService()
+        self.flushSize = flushSize
+        self.pending = {}
+        self.npending = 0
+
+    def add(self, document, input, irregular=True):
+        """Indexes the dates of one document.
+
+        Args:
+            document (int): Document id.
+            input (str): Document text.
+            irregular: get irregular date
+        """
+        for day in self.service.extractDates(input, irregular):
+            period = _ordinalRange(day[0])
+            if period is None:
+                continue
+            key = period[0] * 4 + day[0].count('XX')
+            postings = self.pending.get(key)
+            if postings is None:
+                postings = self.pending[key] = array('q')
+            postings.extend((document, day[1].start, day[1].stop))
+            self.npending += 1
+        if self.npending >= self.flushSize:
+            self.flush()
+
+    def addMany(self, documents, irregular=True):
+        """Indexes a stream of (document id, text) pairs, then flushes."""
+        for document, input in documents:
+            self.add(document, input, irregular)
+        self.flush()
+
+    def flush(self):
+        """Writes the buffered postings as a new segment file."""
+        if not self.npending:
+            return
+        keys = array('q', sorted(self.pending))
+        offsets = array('q', [0])
+        for key in keys:
+            offsets.append(offsets[-1] + len(self.pending[key]) // 3)
+
+        segments = [int(name[:-4]) for name in os.listdir(self.directory)
+                    if name.endswith('.dix') and name[:-4].isdigit()]
+        name = '%08d.dix' % (max(segments) + 1 if segments else 0)
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(self.__magic__)
+            f.write(struct.pack('=qq', len(keys), self.npending))
+            keys.tofile(f)
+            offsets.tofile(f)
+            for key in keys:
+                self.pending[key].tofile(f)
+        os.replace(path + '.tmp', path)
+
+        self.pending = {}
+        self.npending = 0
+
+
+class CorpusIndex(object):
+
+    """Reads the segments written by CorpusIndexWriter through mmap, with
+    no deserialization step; range queries bisect the key column of each
+    segment in place.
+
+    Args:
+        directory (str): Directory holding the segment files.
+    """
+
+    # Longest period, in days, a partial date can cover
+    __maxPeriod__ = 365
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = {}
+        self.refresh()
+
+    def refresh(self):
+        """Opens segments appended since the index was opened."""
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.dix') or name in self.segments:
+                continue
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if mapped[:8] != CorpusIndexWriter.__magic__:
+                mapped.close()
+                raise ValueError('Not a date index segment: ' + name)
+            nkeys, npostings = struct.unpack_from('=qq', mapped, 8)
+            view = memoryview(mapped)[24:].cast('q')
+            self.segments[name] = (
+                mapped, view,
+                view[:nkeys],
+                view[nkeys:2 * nkeys + 1],
+                view[2 * nkeys + 1:2 * nkeys + 1 + 3 * npostings])
+
+    def close(self):
+        for mapped, view, keys, offsets, postings in self.segments.values():
+            for v in (keys, offsets, postings, view):
+                v.release()
+            mapped.close()
+        self.segments = {}
+
+    def postings(self, first, last, partial=False):
+        """Returns the mentions of dates between two days.
+
+        Args:
+            first (datetime.date): First day of the range.
+            last (datetime.date): Last day of the range, inclusive.
+            partial (bool): If True, partial dates are returned when their
+                month or year overlaps the range, rather than only when it
+                lies inside it.
+
+        Returns:
+            A sorted list of (document id, range) tuples.
+        """
+        first = first.toordinal()
+        last = last.toordinal()
+        lo = first - self.__maxPeriod__ if partial else first
+        result = []
+        for mapped, view, keys, offsets, postings in self.segments.values():
+            i = bisect.bisect_left(keys, lo * 4)
+            j = bisect.bisect_left(keys, (last + 1) * 4)
+            for k in range(i, j):
+                key = keys[k]
+                start = key >> 2
+                if key & 3:
+                    stop = _periodEnd(start, key & 3)
+                    if (stop < first) if partial else (stop > last):
+                        continue
+                elif start < first:
+                    continue
+                for p in range(3 * offsets[k], 3 * offsets[k + 1], 3):
+                    result.append((postings[p],
+                                   range(postings[p + 1], postings[p + 2])))
+        result.sort(key=lambda posting: (posting[0], posting[1].start))
+        return result
+
+    def documents(self, first, last, partial=False):
+        """Returns the sorted ids of the documents mentioning a date
+        between two days (see postings)."""
+        return sorted(set(posting[0] for posting in
+                          self.postings(first, last, partial)))
+
+
+class DateAggregate(object):
+
+    """Compact, mergeable counters over the dates extracted from a stream
+    of documents (see DateService.aggregateDates).
+
+    Every year owns an array of 13 * 32 counters indexed by
+    month * 32 + day, where a month or day of 0 stands for 'XX'. Merging
+    is associative and commutative, so aggregates built by separate
+    workers or shards can be combined in any order.
+
+    Attributes:
+        years: Maps each year to its array('Q') of day counters.
+        formats: array('Q') of hit counts indexed by
+            2 * format + relative, formats being ordered as in
+            __formats__.
+        partial: Number of hits with an 'XX' month or day.
+        total: Number of hits.
+        documents: Number of documents aggregated.
+    """
+
+    __formats__ = ('monthDayYear', 'dayMonthYear', 'numeric', 'yearOnly',
+                   'irregular')
+
+    def __init__(self):
+        self.years = {}
+        self.formats = array('Q', [0] * (2 * len(self.__formats__)))
+        self.partial = 0
+        self.total = 0
+        self.documents = 0
+
+    def add(self, date, format, relative=False):
+        """Counts one extracted date.
+
+        Args:
+            date (str): A date in 'MM/DD/YYYY' format, possibly with 'XX'.
+            format (int): Index of the extracting format in __formats__.
+            relative (bool): Whether the date depended on the current date.
+        """
+        month, day, year = date.split('/')
+        year = int(year)
+        counts = self.years.get(year)
+        if counts is None:
+            counts = self.years[year] = array('Q', [0] * (13 * 32))
+        if month == 'XX' or day == 'XX':
+            self.partial += 1
+        month = 0 if month == 'XX' else int(month)
+        day = 0 if day == 'XX' else int(day)
+        counts[month * 32 + day] += 1
+        self.formats[2 * format + relative] += 1
+        self.total += 1
+
+    def merge(self, other):
+        """Adds the counts of another DateAggregate to this one.
+
+        Returns:
+            This DateAggregate.
+        """
+        for year, counts in other.years.items():
+            mine = self.years.get(year)
+            if mine is None:
+                self.years[year] = array('Q', counts)
+            else:
+                for i, n in enumerate(counts):
+                    if n:
+                        mine[i] += n
+        for i, n in enumerate(other.formats):
+            self.formats[i] += n
+        self.partial += other.partial
+        self.total += other.total
+        self.documents += other.documents
+        return self
+
+    def yearCounts(self):
+        """Returns a dict mapping each year to its number of hits."""
+        return dict((year, sum(counts))
+                    for year, counts in self.years.items())
+
+    def monthCounts(self):
+        """Returns a dict mapping (year, month) to its number of hits,
+        month 0 standing for 'XX'."""
+        result = {}
+        for year, counts in self.years.items():
+            for month in range(13):
+                n = sum(counts[month * 32:month * 32 + 32])
+                if n:
+                    result[(year, month)] = n
+        return result
+
+    def dayCounts(self):
+        """Returns a dict mapping (year, month, day) to its number of hits,
+        month or day 0 standing for 'XX'."""
+        return dict(((year, i // 32, i % 32), n)
+                    for year, counts in self.years.items()
+                    for i, n in enumerate(counts) if n)
+
+    def formatCounts(self):
+        """Returns a dict mapping each format name to its
+        (absolute, relative) hit counts."""
+        return dict((name, (self.formats[2 * i], self.formats[2 * i + 1]))
+                    for i, name in enumerate(self.__formats__))
+
+    def partialShare(self):
+        """Returns the share of hits with an 'XX' month or day."""
+        if not self.total:
+            return 0.0
+        return float(self.partial) / self.total
+
+
+# ('YYYY', '/YYYY') strings of the years seen so far
+__yearStrings__ = {}
+
+
+def _yearStrings(year):
+    """Returns the interned ('YYYY', '/YYYY') strings of a year, caching
+    those of the integer years 1 to 9999."""
+    strings = __yearStrings__.get(year)
+    if strings is None:
+        string = '%d' % year
+        strings = (sys.intern(string), sys.intern('/' + string))
+        if type(year) is int and 1 <= year <= 9999:
+            __yearStrings__[year] = strings
+    return strings
+
+
+def _within(matches, window):
+    """Filters an iterator of matches down to those starting inside window,
+    a (start, end) tuple; returns it unchanged if window is None."""
+    if window is None:
+        return matches
+    start, end = window
+    return (m for m in matches if start <= m.start() < end)
+
+
+def _trieRegex(words):
+    """Compiles words into one regex alternation shaped like their trie,
+    so the regex engine never retries a shared prefix. Matches nothing if
+    there are no words."""
+    trie = {}
+    for word in words:
+        node = trie
+        for c in word:
+            node = node.setdefault(c, {})
+        node[''] = {}
+
+    def pattern(node):
+        branches = [re.escape(c) + pattern(node[c]) for c in sorted(node) if c]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        alternation = '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return alternation + '?'
+        return alternation
+
+    if not trie:
+        return '(?!)'
+    return pattern(trie)
+
+
+def _ordinalRange(date):
+    """Returns the first and last day ordinals covered by a 'MM/DD/YYYY'
+    date, where 'XX' parts cover the whole month or year, or None if the
+    year is outside the range of datetime.date."""
+    month, day, year = date.split('/')
+    year = int(year)
+    if not (datetime.MINYEAR <= year <= datetime.MAXYEAR):
+        return None
+    if month == 'XX':
+        return (datetime.date(year, 1, 1).toordinal(),
+                datetime.date(year, 12, 31).toordinal())
+    month = int(month)
+    first = datetime.date(year, month, 1).toordinal()
+    if day == 'XX':
+        return (first, first + calendar.monthrange(year, month)[1] - 1)
+    first += int(day) - 1
+    return (first, first)
+
+
+def _periodEnd(first, precision):
+    """Returns the last day ordinal of the month (precision 1) or year
+    (precision 2) starting on day ordinal first."""
+    day = datetime.date.fromordinal(first)
+    if precision == 2:
+        return datetime.date(day.year, 12, 31).toordinal()
+    return first + calendar.monthrange(day.year, day.month)[1] - 1
+
+
+def _scanSegment(task):
+    """Worker for DateService.extractDatesShared: returns the per-format
+    symbolic hits of the matches starting inside one segment of the shared
+    text, with spans shifted to global offsets, and the failures of those
+    matches."""
+    (name, codec, width, length, start, end, overlap, tz, now, locales,
+     irregular) = task
+    lo = max(0, start - overlap)
+    hi = min(length, end + overlap)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        input = bytes(shm.buf[lo * width:hi * width]).decode(codec)
+    finally:
+        shm.close()
+
+    service = DateService(tz=tz, now=now, locales=locales)
+    window = (start - lo, end - lo)
+    candidates = service._symbolicDays(input, window)
+    if (irregular):
+        candidates.append(service._symbolicIrrDays(input, window=window))
+    return ([[(hit[0] + lo, hit[1] + lo) + hit[2:] for hit in hits if hit]
+             for hits in candidates], service.failures)
+
+
+def extractDates(input, tz=None, now=None, irregular=True, times=False):
     """Extract semantic date information from an input string.
     This is a convenience method which would only be used if
     you'd rather not initialize a DateService object.
@@ -586,4 +1692,38 @@ def extractDates(input, tz=None, now=None, irregular=True):
         A list of datetime objects extracted from input.
     """
     service = DateService(tz=tz, now=now)
-    return service.extractDates(input, irregular)
+    return service.extractDates(input, irregular, times)
+
+
+def aggregateDates(inputs, tz=None, now=None, irregular=True):
+    """Aggregate the dates extracted from a stream of documents.
+    This is a convenience method which would only be used if
+    you'd rather not initialize a DateService object.
+
+    Args:
+        inputs (iterable): The input strings to be parsed.
+        tz: An optional Pytz timezone, as in extractDates.
+        now: The time to which relative dates are resolved, as in
+            extractDates.
+
+    Returns:
+        A DateAggregate of the dates extracted from inputs.
+    """
+    service = DateService(tz=tz, now=now)
+    return service.aggregateDates(inputs, irregular)
+
+
+def resolve(hits, tz=None, now=None):
+    """Resolve symbolic hits, as returned by DateService.extractSymbolic,
+    against a new current date without rescanning the text.
+
+    Args:
+        hits (list): Symbolic hits.
+        tz: An optional Pytz timezone, as in extractDates.
+        now: The time to which the hits are resolved, as in extractDates.
+
+    Returns:
+        A list of (date, range) tuples.
+    """
+    service = DateService(tz=tz, now=now)
+    return service.resolve(hits)
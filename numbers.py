@@ -1,4 +1,5 @@
 import re
+from array import array
 
 
 class NumberService(object):
@@ -83,11 +84,25 @@ class NumberService(object):
         'halve': 'two'
     }
 
+    # Filled lazily by _singleWords
+    __singleWords__ = None
+
     class NumberException(Exception):
 
         def __init__(self, msg):
             Exception.__init__(self, msg)
 
+    # Strings float() accepts, so exact matches need no try/except. float()
+    # strips the whitespace of \s except the separators \x1c-\x1f
+    __exactRegex__ = re.compile(
+        r"""(?ix)[^\S\x1c-\x1f]*[+-]?
+        (
+            (\d(_?\d)*)(\.(\d(_?\d)*)?)?(e[+-]?\d(_?\d)*)?
+            |\.\d(_?\d)*(e[+-]?\d(_?\d)*)?
+            |inf(inity)?
+            |nan
+        )[^\S\x1c-\x1f]*\Z""")
+
     def parse(self, words):
         """A general method for parsing word-representations of numbers.
         Supports floats and integers.
@@ -98,17 +113,26 @@ class NumberService(object):
         Returns:
             A double representation of the words.
         """
+        result = self.tryParse(words)
+        if result is None:
+            raise NumberService.NumberException("Unknown number: " + words)
+        return result
+
+    def tryParse(self, words):
+        """Like parse, but returns None instead of raising when the words
+        do not describe a number.
+
+        Args:
+            words (str): Description of an arbitrary number.
+
+        Returns:
+            A double representation of the words, or None if invalid.
+        """
         words = words.replace(',', '')
-        def exact(words):
-            """If already represented as float or int, convert."""
-            try:
-                return float(words)
-            except:
-                return None
 
-        guess = exact(words)
-        if guess is not None:
-            return guess
+        # If already represented as float or int, convert
+        if self.__exactRegex__.match(words):
+            return float(words)
 
         split = words.split(' ')
 
@@ -120,7 +144,7 @@ class NumberService(object):
 
         parsed_ordinals = ' '.join(split)
 
-        return self.parseFloat(parsed_ordinals)
+        return self._tryParseFloat(parsed_ordinals)
 
     def parseFloat(self, words):
         """Convert a floating-point number described in words to a double.
@@ -135,7 +159,15 @@ class NumberService(object):
         Returns:
             A double representation of the words.
         """
+        result = self._tryParseFloat(words)
+        if result is None:
+            raise NumberService.NumberException("Unknown number: " + words)
+        return result
+
+    def _tryParseFloat(self, words):
+        """parseFloat without exceptions; returns None if invalid."""
         def pointFloat(words):
+            """Returns the value, None if no 'point', False if invalid."""
             m = re.search(r'(.*) point (.*)', words)
             if m:
                 whole = m.group(1)
@@ -143,16 +175,25 @@ class NumberService(object):
                 total = 0.0
                 coeff = 0.10
                 for digit in frac.split(' '):
-                    total += coeff * self.parse(digit)
+                    value = self.tryParse(digit)
+                    if value is None:
+                        return False
+                    total += coeff * value
                     coeff /= 10.0
 
-                return self.parseInt(whole) + total
+                whole = self._tryParseInt(whole)
+                if whole is None:
+                    return False
+                return whole + total
             return None
 
         def fractionFloat(words):
+            """Returns the value, None if no fraction, False if invalid."""
             m = re.search(r'(.*) and (.*)', words)
             if m:
-                whole = self.parseInt(m.group(1))
+                whole = self._tryParseInt(m.group(1))
+                if whole is None:
+                    return False
                 frac = m.group(2)
 
                 # Replace plurals
@@ -168,29 +209,32 @@ class NumberService(object):
                 denom = split[1:]
 
                 while denom:
-                    try:
-                        # Test for valid num, denom
-                        num_value = self.parse(' '.join(num))
-                        denom_value = self.parse(' '.join(denom))
+                    # Test for valid num, denom
+                    num_value = self.tryParse(' '.join(num))
+                    denom_value = self.tryParse(' '.join(denom))
+                    if num_value is not None and denom_value:
                         return whole + float(num_value) / denom_value
-                    except:
-                        # Add another word to num
-                        num += denom[:1]
-                        denom = denom[1:]
+                    # Add another word to num
+                    num += denom[:1]
+                    denom = denom[1:]
             return None
 
         # Extract "one point two five"-type float
         result = pointFloat(words)
+        if result is False:
+            return None
         if result:
             return result
 
         # Extract "one and a quarter"-type float
         result = fractionFloat(words)
+        if result is False:
+            return None
         if result:
             return result
 
         # Parse as integer
-        return self.parseInt(words)
+        return self._tryParseInt(words)
 
     def parseInt(self, words):
         """Parses words to the integer they describe.
@@ -201,6 +245,13 @@ class NumberService(object):
         Returns:
             An integer representation of the words.
         """
+        result = self._tryParseInt(words)
+        if result is None:
+            raise NumberService.NumberException("Unknown number: " + words)
+        return result
+
+    def _tryParseInt(self, words):
+        """parseInt without exceptions; returns None if invalid."""
         # Remove 'and', case-sensitivity
         words = words.replace(" and ", " ").lower()
         # 'a' -> 'one'
@@ -226,18 +277,72 @@ class NumberService(object):
                         n += g * x
                         g = 0
                     else:
-                        raise NumberService.NumberException(
-                            "Unknown number: " + w)
+                        return None
             return n + g
 
         return textToNumber(words)
 
+    def _singleWords(self):
+        """Lookup table from every single-word number description to its
+        value, built once on first use."""
+        if NumberService.__singleWords__ is None:
+            table = {}
+            words = set(self.__small__) | set(self.__magnitude__) | \
+                set(self.__ordinals__) | set(self.__fractions__)
+            words.update(['a', 'hundred'])
+            for w in words:
+                value = self.tryParse(w)
+                if value is not None:
+                    table[w] = float(value)
+            NumberService.__singleWords__ = table
+        return NumberService.__singleWords__
+
+    def parseMany(self, phrases):
+        """Parses a batch of number descriptions without raising on the
+        invalid ones. Pure digit strings and single-word numbers are
+        resolved in bulk through a lookup table; anything else falls back
+        to the full grammar of parse.
+
+        Args:
+            phrases (iterable): Descriptions of arbitrary numbers.
+
+        Returns:
+            A (values, valid) tuple of array.array objects. values holds
+            the parsed numbers as doubles, with 0.0 wherever parsing
+            failed; valid holds 1 for every phrase that parsed and 0
+            otherwise. Both support the buffer protocol, so e.g.
+            numpy.frombuffer(values) wraps them without a copy.
+        """
+        table = self._singleWords()
+        values = array('d')
+        valid = array('b')
+        for words in phrases:
+            if ',' in words:
+                words = words.replace(',', '')
+            if words.isdigit() and words.isascii():
+                values.append(float(words))
+                valid.append(1)
+                continue
+            value = table.get(words)
+            if value is None:
+                value = self.tryParse(words)
+                if value is not None:
+                    try:
+                        value = float(value)
+                    except OverflowError:
+                        # An integer beyond the range of a double
+                        value = None
+                if value is None:
+                    values.append(0.0)
+                    valid.append(0)
+                    continue
+            values.append(value)
+            valid.append(1)
+
+        return values, valid
+
     def isValid(self, input):
-        try:
-            self.parse(input)
-            return True
-        except:
-            return False
+        return self.tryParse(input) is not None
 
     @staticmethod
     def parseMagnitude(m):
@@ -0,0 +1,63 @@
+import unittest
+import datetime
+from dates import DateService
+
+
+class TestExtractDatesShared(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime.datetime(2016, 8, 21)
+
+    def assertSharedMatches(self, text, **kwargs):
+        service = DateService(now=self.now)
+        days = service.extractDates(text)
+        shared = DateService(now=self.now)
+        self.assertEqual(shared.extractDatesShared(text, **kwargs), days)
+        self.assertEqual(shared.failures, service.failures)
+        return days
+
+    def testRunOfYears(self):
+        # Each segment starts its scan at a different offset in the run
+        days = self.assertSharedMatches(
+            'x ' + ' '.join(['1926'] * 3000), processes=2,
+            segmentSize=1001, overlap=100)
+        self.assertEqual(len(days), 2999)
+
+    def testRunOfNumericDates(self):
+        days = self.assertSharedMatches(
+            'x ' + ','.join(['1/2/2001'] * 1000), processes=2,
+            segmentSize=1001, overlap=100)
+        self.assertEqual(len(days), 1000)
+
+
+class TestRegularFormats(unittest.TestCase):
+
+    def testDigitsOutsideAscii(self):
+        service = DateService(now=datetime.datetime(2016, 8, 21))
+        text = 'on \u0663/\u0664/\u0662\u0660\u0660\u0661.'
+        self.assertEqual(service.extractDays(text),
+                         [('03/04/2001', range(3, 11))])
+
+
+class TestTimes(unittest.TestCase):
+
+    def setUp(self):
+        self.service = DateService(now=datetime.datetime(2016, 8, 21, 23, 30))
+
+    def testOffsetFallsOnItsOwnDate(self):
+        self.assertEqual(
+            self.service.extractDates('today, in 2 hours', times=True),
+            [('08/21/2016', range(0, 5), None),
+             ('08/22/2016', range(7, 17), '01:30')])
+
+    def testClockTimeReplacesPartOfDay(self):
+        self.assertEqual(
+            self.service.extractDates('this evening at 7:15', times=True),
+            [('08/21/2016', range(0, 12), '19:15')])
+        self.assertEqual(
+            self.service.extractDates('tonight at 9:00', times=True),
+            [('08/21/2016', range(0, 7), '21:00')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from numbers import NumberService
+
+
+class TestNumberService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = NumberService()
+
+    def testSeparatorsAreInvalid(self):
+        # float() strips the whitespace of \s except \x1c-\x1f
+        for c in '\x1c\x1d\x1e\x1f':
+            self.assertIsNone(self.service.tryParse(c + '5'))
+            self.assertIsNone(self.service.tryParse('5' + c))
+            self.assertFalse(self.service.isValid(c + '5'))
+            self.assertRaises(NumberService.NumberException,
+                              self.service.parse, c + '5')
+
+        values, valid = self.service.parseMany(['\x1f5', ' 5\t'])
+        self.assertEqual(list(values), [0.0, 5.0])
+        self.assertEqual(list(valid), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()